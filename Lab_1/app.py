@@ -1,43 +1,70 @@
 import tkinter as tk
+from functools import lru_cache
 from tkinter import colorchooser
-from typing import Dict, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class RGB(NamedTuple):
+    r: float
+    g: float
+    b: float
+
+
+class HLS(NamedTuple):
+    h: float
+    l: float
+    s: float
+
+
+class CMYK(NamedTuple):
+    c: float
+    m: float
+    y: float
+    k: float
 
 
 def clamp(value: float, min_value: float, max_value: float) -> float:
     return max(min_value, min(max_value, value))
 
 
-def rgb_to_hex(rgb: Dict[str, float]) -> str:
-    r, g, b = int(rgb["r"]), int(rgb["g"]), int(rgb["b"])
+# The UI always passes whole 0..255 channels, so slider drags keep hitting the same triples;
+# the results are immutable tuples/strings and safe to share between callers.
+@lru_cache(maxsize=4096)
+def rgb_to_hex(rgb: RGB) -> str:
+    r, g, b = int(rgb.r), int(rgb.g), int(rgb.b)
     return f"#{r:02X}{g:02X}{b:02X}"
 
 
-def rgb_to_cmyk(r: float, g: float, b: float) -> Dict[str, float]:
+@lru_cache(maxsize=4096)
+def rgb_to_cmyk(r: float, g: float, b: float) -> CMYK:
     r1, g1, b1 = r / 255, g / 255, b / 255
     k = 1 - max(r1, g1, b1)
     if k == 1:
-        return {"c": 0, "m": 0, "y": 0, "k": 100}
+        return CMYK(0, 0, 0, 100)
     c = ((1 - r1 - k) / (1 - k)) * 100
     m = ((1 - g1 - k) / (1 - k)) * 100
     y = ((1 - b1 - k) / (1 - k)) * 100
-    return {"c": c, "m": m, "y": y, "k": k * 100}
+    return CMYK(c, m, y, k * 100)
 
 
-def cmyk_to_rgb(c: float, m: float, y: float, k: float) -> Dict[str, float]:
+def cmyk_to_rgb(c: float, m: float, y: float, k: float) -> RGB:
     c1, m1, y1, k1 = (clamp(v, 0, 100) / 100 for v in (c, m, y, k))
-    return {
-        "r": round(255 * (1 - c1) * (1 - k1)),
-        "g": round(255 * (1 - m1) * (1 - k1)),
-        "b": round(255 * (1 - y1) * (1 - k1)),
-    }
+    return RGB(
+        round(255 * (1 - c1) * (1 - k1)),
+        round(255 * (1 - m1) * (1 - k1)),
+        round(255 * (1 - y1) * (1 - k1)),
+    )
 
 
-def rgb_to_hls(r: float, g: float, b: float) -> Dict[str, float]:
-    r1, g1, b1 = (v / 255 for v in (r, g, b))
+@lru_cache(maxsize=4096)
+def rgb_to_hls(r: float, g: float, b: float) -> HLS:
+    r1, g1, b1 = r / 255, g / 255, b / 255
     max_v, min_v = max(r1, g1, b1), min(r1, g1, b1)
     l = (max_v + min_v) / 2
     if max_v == min_v:
-        return {"h": 0, "l": l * 100, "s": 0}
+        return HLS(0, l * 100, 0)
 
     d = max_v - min_v
     s = d / (1 - abs(2 * l - 1))
@@ -49,35 +76,96 @@ def rgb_to_hls(r: float, g: float, b: float) -> Dict[str, float]:
     else:
         h = (r1 - g1) / d + 4
 
-    return {"h": (h * 60) % 360, "l": l * 100, "s": s * 100}
+    return HLS((h * 60) % 360, l * 100, s * 100)
+
 
+def _hue_to_rgb(p: float, q: float, t: float) -> float:
+    if t < 0:
+        t += 1
+    if t > 1:
+        t -= 1
+    if t < 1 / 6:
+        return p + (q - p) * 6 * t
+    if t < 1 / 2:
+        return q
+    if t < 2 / 3:
+        return p + (q - p) * (2 / 3 - t) * 6
+    return p
 
-def hls_to_rgb(h: float, l: float, s: float) -> Dict[str, float]:
+
+def hls_to_rgb(h: float, l: float, s: float) -> RGB:
     h1 = ((h % 360) + 360) % 360 / 360
     l1, s1 = clamp(l, 0, 100) / 100, clamp(s, 0, 100) / 100
     if s1 == 0:
         val = round(l1 * 255)
-        return {"r": val, "g": val, "b": val}
-
-    def hue_to_rgb(p: float, q: float, t: float) -> float:
-        if t < 0:
-            t += 1
-        if t > 1:
-            t -= 1
-        if t < 1 / 6:
-            return p + (q - p) * 6 * t
-        if t < 1 / 2:
-            return q
-        if t < 2 / 3:
-            return p + (q - p) * (2 / 3 - t) * 6
-        return p
+        return RGB(val, val, val)
 
     q = l1 * (1 + s1) if l1 < 0.5 else l1 + s1 - l1 * s1
     p = 2 * l1 - q
-    r = hue_to_rgb(p, q, h1 + 1 / 3)
-    g = hue_to_rgb(p, q, h1)
-    b = hue_to_rgb(p, q, h1 - 1 / 3)
-    return {"r": round(r * 255), "g": round(g * 255), "b": round(b * 255)}
+    r = _hue_to_rgb(p, q, h1 + 1 / 3)
+    g = _hue_to_rgb(p, q, h1)
+    b = _hue_to_rgb(p, q, h1 - 1 / 3)
+    return RGB(round(r * 255), round(g * 255), round(b * 255))
+
+
+# Array versions of the conversions above: the last axis holds the channels,
+# so (N, 3) / (N, 4) batches or whole (H, W, 3) images convert in one call.
+def rgb_to_cmyk_vec(rgb: np.ndarray) -> np.ndarray:
+    rgb1 = np.asarray(rgb, dtype=np.float64) / 255
+    k = 1 - rgb1.max(axis=-1)
+    black = k == 1
+    denom = np.where(black, 1, 1 - k)[..., None]
+    cmy = np.where(black[..., None], 0, (1 - rgb1 - k[..., None]) / denom * 100)
+    return np.concatenate((cmy, (k * 100)[..., None]), axis=-1)
+
+
+def cmyk_to_rgb_vec(cmyk: np.ndarray) -> np.ndarray:
+    cmyk1 = np.clip(np.asarray(cmyk, dtype=np.float64), 0, 100) / 100
+    rgb = 255 * (1 - cmyk1[..., :3]) * (1 - cmyk1[..., 3:])
+    return np.round(rgb).astype(np.int64)
+
+
+def rgb_to_hls_vec(rgb: np.ndarray) -> np.ndarray:
+    rgb1 = np.asarray(rgb, dtype=np.float64) / 255
+    r1, g1, b1 = rgb1[..., 0], rgb1[..., 1], rgb1[..., 2]
+    max_v, min_v = rgb1.max(axis=-1), rgb1.min(axis=-1)
+    l = (max_v + min_v) / 2
+    d = max_v - min_v
+    grey = d == 0
+    d = np.where(grey, 1, d)
+    s = np.where(grey, 0, d / np.where(grey, 1, 1 - np.abs(2 * l - 1)))
+    h = np.select(
+        [max_v == r1, max_v == g1],
+        [(g1 - b1) / d + np.where(g1 < b1, 6, 0), (b1 - r1) / d + 2],
+        (r1 - g1) / d + 4,
+    )
+    h = np.where(grey, 0, (h * 60) % 360)
+    return np.stack((h, l * 100, s * 100), axis=-1)
+
+
+def _hue_to_rgb_vec(p: np.ndarray, q: np.ndarray, t: np.ndarray) -> np.ndarray:
+    t = np.where(t < 0, t + 1, t)
+    t = np.where(t > 1, t - 1, t)
+    return np.select(
+        [t < 1 / 6, t < 1 / 2, t < 2 / 3],
+        [p + (q - p) * 6 * t, q, p + (q - p) * (2 / 3 - t) * 6],
+        p,
+    )
+
+
+def hls_to_rgb_vec(hls: np.ndarray) -> np.ndarray:
+    hls = np.asarray(hls, dtype=np.float64)
+    h1 = ((hls[..., 0] % 360) + 360) % 360 / 360
+    l1 = np.clip(hls[..., 1], 0, 100) / 100
+    s1 = np.clip(hls[..., 2], 0, 100) / 100
+    # with s1 == 0 we get p == q == l1, so greys need no separate branch
+    q = np.where(l1 < 0.5, l1 * (1 + s1), l1 + s1 - l1 * s1)
+    p = 2 * l1 - q
+    rgb = np.stack(
+        (_hue_to_rgb_vec(p, q, h1 + 1 / 3), _hue_to_rgb_vec(p, q, h1), _hue_to_rgb_vec(p, q, h1 - 1 / 3)),
+        axis=-1,
+    )
+    return np.round(rgb * 255).astype(np.int64)
 
 
 class ColorApp:
@@ -86,8 +174,11 @@ class ColorApp:
         self.root.title("Цветовые модели: CMYK · RGB · HLS")
         self.root.geometry("880x620")
         self.updating = False
-        self.state = {"r": 127, "g": 86, "b": 217}
-        self.controls: Dict[str, Dict[str, Tuple[tk.Entry, tk.Scale]]] = {}
+        self.state = RGB(127, 86, 217)
+        # per model, one (entry, scale) pair per channel in the model's tuple order
+        self.controls: Dict[str, List[Tuple[tk.Entry, tk.Scale]]] = {}
+        # value text each (model, index) scale was last set to, so unchanged scales are not moved again
+        self.shown: Dict[Tuple[str, int], str] = {}
 
         self._build_ui()
         self.update_from_rgb(self.state)
@@ -130,7 +221,7 @@ class ColorApp:
     def _build_model_card(self, parent: tk.Frame, title: str, model_key: str, channels) -> None:
         card = tk.LabelFrame(parent, text=title, padx=10, pady=6, font=("Segoe UI", 10, "bold"))
         card.pack(side="left", fill="both", expand=True, padx=6, pady=6)
-        self.controls[model_key] = {}
+        self.controls[model_key] = []
         for idx, (channel, min_v, max_v) in enumerate(channels):
             row = tk.Frame(card)
             row.pack(fill="x", pady=4)
@@ -138,8 +229,8 @@ class ColorApp:
 
             entry = tk.Entry(row, width=8, justify="center")
             entry.pack(side="left", padx=6)
-            entry.bind("<Return>", lambda e, m=model_key, c=channel: self.handle_entry(m, c))
-            entry.bind("<FocusOut>", lambda e, m=model_key, c=channel: self.handle_entry(m, c))
+            entry.bind("<Return>", lambda e, m=model_key, i=idx: self.handle_entry(m, i))
+            entry.bind("<FocusOut>", lambda e, m=model_key, i=idx: self.handle_entry(m, i))
 
             scale = tk.Scale(
                 row,
@@ -148,64 +239,66 @@ class ColorApp:
                 orient="horizontal",
                 resolution=0.1 if model_key == "hls" else 1,
                 length=220,
-                command=lambda v, m=model_key, c=channel: self.handle_scale(m, c, v),
+                command=lambda v, m=model_key, i=idx: self.handle_scale(m, i, v),
             )
             scale.pack(side="left", fill="x", expand=True)
-            self.controls[model_key][channel] = (entry, scale)
+            self.controls[model_key].append((entry, scale))
 
-    def set_channel(self, model: str, channel: str, value: float) -> None:
-        entry, scale = self.controls[model][channel]
-        entry.delete(0, tk.END)
+    def set_channel(self, model: str, index: int, value: float, move_scale: bool = True) -> None:
         numeric = float(value)
-        entry.insert(0, f"{numeric:.1f}" if not numeric.is_integer() else f"{int(numeric)}")
-        scale.set(value)
-
-    def handle_entry(self, model: str, channel: str) -> None:
+        text = f"{numeric:.1f}" if not numeric.is_integer() else f"{int(numeric)}"
+        key = (model, index)
+        entry, scale = self.controls[model][index]
+        # compared with what the entry holds now: the user may have typed into it since the last update
+        if entry.get() != text:
+            entry.delete(0, tk.END)
+            entry.insert(0, text)
+        if not move_scale:
+            # the dragged scale may sit off the shown value; forget it so the next update snaps it back
+            self.shown.pop(key, None)
+        elif self.shown.get(key) != text:
+            scale.set(value)
+            self.shown[key] = text
+
+    def handle_entry(self, model: str, index: int) -> None:
         if self.updating:
             return
-        entry, _ = self.controls[model][channel]
+        entry, _ = self.controls[model][index]
         try:
             value = float(entry.get())
         except ValueError:
             return
-        self.route_update(model, channel, value)
+        self.route_update(model, index, value)
 
-    def handle_scale(self, model: str, channel: str, value: str) -> None:
+    def handle_scale(self, model: str, index: int, value: str) -> None:
         if self.updating:
             return
-        self.route_update(model, channel, float(value))
+        self.route_update(model, index, float(value), source=(model, index))
 
-    def route_update(self, model: str, channel: str, value: float) -> None:
+    def route_update(self, model: str, index: int, value: float, source: Optional[Tuple[str, int]] = None) -> None:
         if model == "rgb":
-            rgb = dict(self.state)
-            rgb[channel] = clamp(value, 0, 255)
-            self.update_from_rgb(rgb)
+            vals = list(self.state)
+            vals[index] = clamp(value, 0, 255)
+            self.update_from_rgb(RGB(*vals), source)
         elif model == "hls":
-            vals = {ch: float(self.controls["hls"][ch][0].get() or 0) for ch in self.controls["hls"]}
-            vals[channel] = value
-            rgb = hls_to_rgb(vals["h"], vals["l"], vals["s"])
-            self.update_from_rgb(rgb)
+            vals = [float(entry.get() or 0) for entry, _ in self.controls["hls"]]
+            vals[index] = value
+            self.update_from_rgb(hls_to_rgb(*vals), source)
         elif model == "cmyk":
-            vals = {ch: float(self.controls["cmyk"][ch][0].get() or 0) for ch in self.controls["cmyk"]}
-            vals[channel] = value
-            rgb = cmyk_to_rgb(vals["c"], vals["m"], vals["y"], vals["k"])
-            self.update_from_rgb(rgb)
+            vals = [float(entry.get() or 0) for entry, _ in self.controls["cmyk"]]
+            vals[index] = value
+            self.update_from_rgb(cmyk_to_rgb(*vals), source)
 
-    def update_from_rgb(self, rgb: Dict[str, float]) -> None:
+    def update_from_rgb(self, rgb: RGB, source: Optional[Tuple[str, int]] = None) -> None:
+        """Refresh every control from rgb; the scale named by source is being dragged and is left alone."""
         self.updating = True
-        self.state = {k: clamp(round(v), 0, 255) for k, v in rgb.items()}
-        r, g, b = self.state["r"], self.state["g"], self.state["b"]
-
-        for ch, val in self.state.items():
-            self.set_channel("rgb", ch, val)
-
-        hls = rgb_to_hls(r, g, b)
-        for ch in ("h", "l", "s"):
-            self.set_channel("hls", ch, hls[ch])
+        r, g, b = rgb
+        self.state = RGB(clamp(round(r), 0, 255), clamp(round(g), 0, 255), clamp(round(b), 0, 255))
+        r, g, b = self.state
 
-        cmyk = rgb_to_cmyk(r, g, b)
-        for ch in ("c", "m", "y", "k"):
-            self.set_channel("cmyk", ch, cmyk[ch])
+        for model, values in (("rgb", self.state), ("hls", rgb_to_hls(r, g, b)), ("cmyk", rgb_to_cmyk(r, g, b))):
+            for idx, val in enumerate(values):
+                self.set_channel(model, idx, val, move_scale=(model, idx) != source)
 
         hex_code = rgb_to_hex(self.state)
         self.preview_box.config(bg=hex_code)
@@ -218,7 +311,7 @@ class ColorApp:
         result = colorchooser.askcolor(color=rgb_to_hex(self.state), title="Выберите цвет")
         if result and result[0]:
             r, g, b = result[0]
-            self.update_from_rgb({"r": r, "g": g, "b": b})
+            self.update_from_rgb(RGB(r, g, b))
 
     def run(self) -> None:
         self.root.mainloop()
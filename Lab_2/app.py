@@ -2,34 +2,42 @@ import cv2
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog, ttk
-from typing import Callable, Dict, Tuple
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from sauvola import sauvola
+
+CACHE_LIMIT = 32
 
 
 def load_image(path: str) -> np.ndarray:
-    img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+    img = cv2.imread(path, cv2.IMREAD_COLOR) if path.isascii() else None
+    if img is None:
+        # imread cannot open non-ASCII paths on Windows: decode a zero-copy view of the file bytes
+        with open(path, "rb") as f:
+            img = cv2.imdecode(np.frombuffer(f.read(), dtype=np.uint8), cv2.IMREAD_COLOR)
     if img is None:
         raise FileNotFoundError(f"Cannot read image: {path}")
     return img
 
 
-def to_display(img: np.ndarray) -> np.ndarray:
-    """Convert BGR to Tk-compatible RGB and ensure 8-bit."""
-    img = np.clip(img, 0, 255).astype(np.uint8)
-    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+def to_display(img: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert BGR (or single-channel gray) to Tk-compatible RGB and ensure 8-bit."""
+    if img.dtype != np.uint8:
+        img = np.clip(img, 0, 255).astype(np.uint8)
+    code = cv2.COLOR_GRAY2RGB if img.ndim == 2 else cv2.COLOR_BGR2RGB
+    return cv2.cvtColor(img, code, dst=dst)
 
 
-def adaptive_gaussian(gray: np.ndarray, block_size: int, c: float) -> np.ndarray:
+def adaptive_gaussian(gray: np.ndarray, block_size: int, c: float, dst: Optional[np.ndarray] = None) -> np.ndarray:
     blk = max(3, block_size | 1)  # make odd and at least 3
-    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blk, c)
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blk, c, dst=dst)
 
 
-def sauvola(gray: np.ndarray, block_size: int, k: float = 0.2, r: float = 128.0) -> np.ndarray:
-    blk = max(3, block_size | 1)
-    mean = cv2.boxFilter(gray.astype(np.float32), -1, (blk, blk), normalize=True)
-    sqmean = cv2.boxFilter((gray.astype(np.float32) ** 2), -1, (blk, blk), normalize=True)
-    std = np.sqrt(np.maximum(sqmean - mean ** 2, 0))
-    thresh = mean * (1 + k * (std / r - 1))
-    return (gray > thresh).astype(np.uint8) * 255
+def remember(cache: Dict, key: Hashable, value) -> None:
+    """Store value, dropping the oldest entry once the cache is full."""
+    if len(cache) >= CACHE_LIMIT:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
 
 
 class ImageApp:
@@ -40,6 +48,10 @@ class ImageApp:
 
         self.images: Dict[str, np.ndarray] = {}
         self.current_key = ""
+        self._gray_cache: Dict[str, np.ndarray] = {}
+        self._photo_cache: Dict[tuple, tk.PhotoImage] = {}
+        self._ppm_buf = np.empty(0, dtype=np.uint8)
+        self._binary_buf = np.empty((0, 0), dtype=np.uint8)
 
         self.params = {
             "block": tk.IntVar(value=25),
@@ -58,19 +70,19 @@ class ImageApp:
 
         tk.Label(controls, text="Блок (окно):").pack(side="left")
         tk.Spinbox(controls, from_=3, to=99, increment=2, textvariable=self.params["block"], width=5,
-                   command=self.render).pack(side="left", padx=4)
+                   command=self._render_thresholds).pack(side="left", padx=4)
 
         tk.Label(controls, text="C (Adaptive Gauss):").pack(side="left", padx=(12, 0))
         tk.Spinbox(controls, from_=-20, to=20, increment=0.5, textvariable=self.params["c"], width=6,
-                   command=self.render).pack(side="left", padx=4)
+                   command=self._render_gauss).pack(side="left", padx=4)
 
         tk.Label(controls, text="k (Sauvola):").pack(side="left", padx=(12, 0))
         tk.Spinbox(controls, from_=-0.2, to=0.5, increment=0.05, textvariable=self.params["k"], width=6,
-                   command=self.render).pack(side="left", padx=4)
+                   command=self._render_sauvola).pack(side="left", padx=4)
 
         tk.Label(controls, text="R (Sauvola):").pack(side="left", padx=(12, 0))
         tk.Spinbox(controls, from_=10, to=255, increment=5, textvariable=self.params["r"], width=6,
-                   command=self.render).pack(side="left", padx=4)
+                   command=self._render_sauvola).pack(side="left", padx=4)
 
         tk.Button(controls, text="Загрузить своё изображение", command=self.open_file).pack(side="right")
 
@@ -113,6 +125,7 @@ class ImageApp:
         path = filedialog.askopenfilename(filetypes=[("Images", "*.png *.jpg *.jpeg *.bmp")])
         if not path:
             return
+        self._forget(path)
         self.images[path] = load_image(path)
         values = list(self.combo["values"]) + [path]
         self.combo["values"] = values
@@ -126,40 +139,83 @@ class ImageApp:
             self.current_key = sel
             self.render()
 
-    def apply_methods(self, img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    def _forget(self, key: str) -> None:
+        """Drop everything cached for an image that is being (re)loaded."""
+        self._gray_cache.pop(key, None)
+        for cache_key in [ck for ck in self._photo_cache if ck[0] == key]:
+            del self._photo_cache[cache_key]
+
+    def _read_params(self) -> Tuple[int, float, float, float]:
         block = max(3, int(self.params["block"].get()) | 1)
         c = float(self.params["c"].get())
         k = float(self.params["k"].get())
         r = float(self.params["r"].get())
+        return block, c, k, r
 
-        gauss = adaptive_gaussian(gray, block, c)
-        sau = sauvola(gray, block, k=k, r=r)
-        return gauss, sau
+    def _gray(self) -> np.ndarray:
+        gray = self._gray_cache.get(self.current_key)
+        if gray is None:
+            gray = cv2.cvtColor(self.images[self.current_key], cv2.COLOR_BGR2GRAY)
+            self._gray_cache[self.current_key] = gray
+        return gray
 
     def render(self) -> None:
-        if not self.current_key or self.current_key not in self.images:
-            return
-        img = self.images[self.current_key]
-        gauss, sau = self.apply_methods(img)
-
-        views = {
-            "Исходник": to_display(img),
-            "Adaptive Gaussian": to_display(cv2.cvtColor(gauss, cv2.COLOR_GRAY2BGR)),
-            "Sauvola": to_display(cv2.cvtColor(sau, cv2.COLOR_GRAY2BGR)),
-        }
-        for title, arr in views.items():
-            h, w = arr.shape[:2]
-            scale = min(1.0, 360 / h, 360 / w)
-            disp = cv2.resize(arr, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
-            # encode to PhotoImage via PPM bytes
-            rgb = disp
-            h2, w2 = rgb.shape[:2]
-            header = f"P6 {w2} {h2} 255 ".encode()
-            data = header + rgb.tobytes()
-            photo = tk.PhotoImage(data=data)
-            self.panels[title].configure(image=photo)
-            self.panels[title].image = photo
+        self._render_source()
+        self._render_thresholds()
+
+    # Each panel depends on its own subset of the parameters; spinboxes only re-render
+    # the panels they affect, and the photo cache is keyed by that subset.
+    def _render_source(self) -> None:
+        if self.current_key in self.images:
+            self._show("Исходник", (), lambda: self.images[self.current_key])
+
+    def _render_thresholds(self) -> None:
+        self._render_gauss()
+        self._render_sauvola()
+
+    def _render_gauss(self) -> None:
+        if self.current_key in self.images:
+            block, c, _, _ = self._read_params()
+            self._show("Adaptive Gaussian", (block, c),
+                       lambda: adaptive_gaussian(self._gray(), block, c, dst=self._binary_dst()))
+
+    def _render_sauvola(self) -> None:
+        if self.current_key in self.images:
+            block, _, k, r = self._read_params()
+            self._show("Sauvola", (block, k, r),
+                       lambda: sauvola(self._gray(), block, k=k, r=r, dst=self._binary_dst()))
+
+    def _binary_dst(self) -> np.ndarray:
+        """Output buffer for a threshold result; _to_photo copies it out, so one buffer serves both panels."""
+        shape = self._gray().shape
+        if self._binary_buf.shape != shape:
+            self._binary_buf = np.empty(shape, dtype=np.uint8)
+        return self._binary_buf
+
+    def _show(self, title: str, params: tuple, make_img: Callable[[], np.ndarray]) -> None:
+        key = (self.current_key, title, params)
+        photo = self._photo_cache.get(key)
+        if photo is None:
+            photo = self._to_photo(make_img())
+            remember(self._photo_cache, key, photo)
+        self.panels[title].configure(image=photo)
+        self.panels[title].image = photo
+
+    def _to_photo(self, img: np.ndarray) -> tk.PhotoImage:
+        h, w = img.shape[:2]
+        scale = min(1.0, 360 / h, 360 / w)
+        w2, h2 = int(w * scale), int(h * scale)
+        # encode to PhotoImage via PPM bytes: header and pixels share one reusable buffer,
+        # so the resized image is written in place and copied out exactly once
+        header = f"P6 {w2} {h2} 255 ".encode()
+        size = len(header) + w2 * h2 * 3
+        if self._ppm_buf.size < size:
+            self._ppm_buf = np.empty(size, dtype=np.uint8)
+        buf = self._ppm_buf[:size]
+        buf[: len(header)] = np.frombuffer(header, dtype=np.uint8)
+        disp = cv2.resize(img, (w2, h2), interpolation=cv2.INTER_AREA)
+        to_display(disp, dst=buf[len(header):].reshape(h2, w2, 3))
+        return tk.PhotoImage(data=buf.tobytes())
 
     def run(self) -> None:
         self.root.mainloop()
@@ -1,14 +1,25 @@
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 import cv2
 import numpy as np
 from fpdf import FPDF
 
+from sauvola import HAS_NUMBA, sauvola
+
+PANEL_W, PANEL_GAP = 60, 8  # mm on the report page
+STRIP_W = 3 * PANEL_W + 2 * PANEL_GAP
+
 
 def load_image(path: Path) -> np.ndarray:
-    img = cv2.imdecode(np.fromfile(str(path), dtype=np.uint8), cv2.IMREAD_COLOR)
+    img = cv2.imread(str(path), cv2.IMREAD_COLOR) if str(path).isascii() else None
+    if img is None:
+        # imread cannot open non-ASCII paths on Windows: decode a zero-copy view of the file bytes
+        with open(path, "rb") as f:
+            img = cv2.imdecode(np.frombuffer(f.read(), dtype=np.uint8), cv2.IMREAD_COLOR)
     if img is None:
         raise FileNotFoundError(f"Cannot read image: {path}")
     return img
@@ -19,14 +30,34 @@ def adaptive_gaussian(gray: np.ndarray, block_size: int, c: float) -> np.ndarray
     return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, blk, c)
 
 
-def sauvola(gray: np.ndarray, block_size: int, k: float = 0.2, r: float = 128.0) -> np.ndarray:
+def has_cuda() -> bool:
+    return hasattr(cv2, "cuda") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+
+
+def sauvola_cuda(img: np.ndarray, block_size: int, k: float = 0.2, r: float = 128.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Grayscale conversion and Sauvola on the GPU; returns (gray, binary) on the host."""
     blk = max(3, block_size | 1)
-    gray_f = gray.astype(np.float32)
-    mean = cv2.boxFilter(gray_f, -1, (blk, blk), normalize=True)
-    sqmean = cv2.boxFilter(gray_f * gray_f, -1, (blk, blk), normalize=True)
-    std = np.sqrt(np.maximum(sqmean - mean ** 2, 0))
-    thresh = mean * (1 + k * (std / r - 1))
-    return (gray_f > thresh).astype(np.uint8) * 255
+    stream = cv2.cuda_Stream()
+    src = cv2.cuda_GpuMat()
+    src.upload(img, stream=stream)
+    gray = cv2.cuda.cvtColor(src, cv2.COLOR_BGR2GRAY, stream=stream)
+    gray_f = gray.convertTo(cv2.CV_32FC1, stream=stream)
+
+    box = cv2.cuda.createBoxFilter(cv2.CV_32FC1, cv2.CV_32FC1, (blk, blk))
+    mean = box.apply(gray_f, stream=stream)
+    sqmean = box.apply(cv2.cuda.sqr(gray_f, stream=stream), stream=stream)
+    var = cv2.cuda.subtract(sqmean, cv2.cuda.sqr(mean, stream=stream), stream=stream)
+    _, var = cv2.cuda.threshold(var, 0, 0, cv2.THRESH_TOZERO, stream=stream)
+    std = cv2.cuda.sqrt(var, stream=stream)
+    # thresh = mean * (1 + k * (std / r - 1)) = mean * (std * k / r + 1 - k)
+    factor = cv2.cuda.addWeighted(std, k / r, std, 0, 1 - k, stream=stream)
+    thresh = cv2.cuda.multiply(mean, factor, stream=stream)
+    binary = cv2.cuda.compare(gray_f, thresh, cv2.CMP_GT, stream=stream)
+
+    gray_host = gray.download(stream=stream)
+    binary_host = binary.download(stream=stream)
+    stream.waitForCompletion()
+    return gray_host, binary_host
 
 
 def save_image(path: Path, img: np.ndarray) -> None:
@@ -34,27 +65,59 @@ def save_image(path: Path, img: np.ndarray) -> None:
     cv2.imencode(".png", img)[1].tofile(str(path))
 
 
-def process_images(src_dir: Path, out_dir: Path, params: Dict[str, float]) -> Dict[str, Dict[str, Path]]:
-    results: Dict[str, Dict[str, Path]] = {}
-    for img_path in src_dir.glob("*.*"):
-        if img_path.suffix.lower() not in {".jpg", ".jpeg", ".png", ".bmp"}:
-            continue
-        name = img_path.stem
-        img = load_image(img_path)
+def save_strip(path: Path, panels: List[np.ndarray]) -> None:
+    """Save the panels side by side as one JPEG, with white gaps matching the report layout."""
+    h, w = panels[0].shape[:2]
+    gap = np.full((h, round(w * PANEL_GAP / PANEL_W), 3), 255, dtype=np.uint8)
+    strip = cv2.hconcat([panels[0], gap, panels[1], gap, panels[2]])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # PDF stores JPEG data as is, so FPDF embeds it without decoding or re-encoding
+    cv2.imencode(".jpg", strip, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tofile(str(path))
+
+
+def _process_one(
+    img_path: Path, out_dir: Path, strip_dir: Path, params: Dict[str, float], use_cuda: bool = False
+) -> Tuple[str, Dict[str, Path]]:
+    name = img_path.stem
+    img = load_image(img_path)
+    if use_cuda:
+        gray, sau = sauvola_cuda(img, int(params["block"]), k=params["k"], r=params["r"])
+    else:
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        gauss = adaptive_gaussian(gray, int(params["block"]), params["c"])
         sau = sauvola(gray, int(params["block"]), k=params["k"], r=params["r"])
-
-        out_paths = {
-            "source": out_dir / f"{name}_source.png",
-            "adaptive_gaussian": out_dir / f"{name}_adaptive_gaussian.png",
-            "sauvola": out_dir / f"{name}_sauvola.png",
-        }
-        save_image(out_paths["source"], img)
-        save_image(out_paths["adaptive_gaussian"], cv2.cvtColor(gauss, cv2.COLOR_GRAY2BGR))
-        save_image(out_paths["sauvola"], cv2.cvtColor(sau, cv2.COLOR_GRAY2BGR))
-        results[name] = out_paths
-    return results
+    # OpenCV has no CUDA adaptiveThreshold; a single CPU call keeps the output identical
+    gauss = adaptive_gaussian(gray, int(params["block"]), params["c"])
+
+    out_paths = {
+        "source": out_dir / f"{name}_source.png",
+        "adaptive_gaussian": out_dir / f"{name}_adaptive_gaussian.png",
+        "sauvola": out_dir / f"{name}_sauvola.png",
+        "strip": strip_dir / f"{name}_strip.jpg",
+    }
+    gauss_bgr = cv2.cvtColor(gauss, cv2.COLOR_GRAY2BGR)
+    sau_bgr = cv2.cvtColor(sau, cv2.COLOR_GRAY2BGR)
+    save_image(out_paths["source"], img)
+    save_image(out_paths["adaptive_gaussian"], gauss_bgr)
+    save_image(out_paths["sauvola"], sau_bgr)
+    save_strip(out_paths["strip"], [img, gauss_bgr, sau_bgr])
+    return name, out_paths
+
+
+def process_images(
+    src_dir: Path, out_dir: Path, strip_dir: Path, params: Dict[str, float]
+) -> Dict[str, Dict[str, Path]]:
+    """Save the three panels of every image to out_dir and the report strips to strip_dir."""
+    paths = [p for p in src_dir.glob("*.*") if p.suffix.lower() in {".jpg", ".jpeg", ".png", ".bmp"}]
+    use_cuda = has_cuda()
+    if HAS_NUMBA and not use_cuda:
+        # start Numba's thread pool from the main thread: a TBB pool first entered from a
+        # worker thread can hang the interpreter at exit
+        sauvola(np.zeros((8, 8), dtype=np.uint8), 3)
+    # images are independent and OpenCV releases the GIL while decoding, filtering and
+    # encoding, so plain threads are enough to keep every core busy
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        futures = [ex.submit(_process_one, p, out_dir, strip_dir, params, use_cuda) for p in paths]
+        return dict(f.result() for f in futures)
 
 
 def add_title(pdf: FPDF, text: str) -> None:
@@ -69,20 +132,19 @@ def add_paragraph(pdf: FPDF, text: str) -> None:
     pdf.ln(2)
 
 
-def add_images_row(pdf: FPDF, caption: str, paths: Tuple[Path, Path, Path]) -> None:
+def add_images_row(pdf: FPDF, caption: str, strip_path: Path) -> None:
     pdf.set_font("DejaVu", "B", 12)
     pdf.cell(0, 8, caption, ln=1)
     pdf.ln(1)
     y_start = pdf.get_y()
-    widths = [60, 60, 60]
+    pdf.image(str(strip_path), x=pdf.l_margin, y=y_start, w=STRIP_W)
     labels = ["Исходник", "Adaptive Gaussian", "Sauvola"]
+    pdf.set_font("DejaVu", size=10)
     x = pdf.l_margin
-    for img_path, w, label in zip(paths, widths, labels):
-        pdf.image(str(img_path), x=x, y=y_start, w=w)
+    for label in labels:
         pdf.set_xy(x, y_start + 62)
-        pdf.set_font("DejaVu", size=10)
-        pdf.cell(w, 6, label, align="C")
-        x += w + 8
+        pdf.cell(PANEL_W, 6, label, align="C")
+        x += PANEL_W + PANEL_GAP
     pdf.ln(72)
 
 
@@ -103,11 +165,7 @@ def build_report(results: Dict[str, Dict[str, Path]], params: Dict[str, float],
                        f"k={params['k']}, R={params['r']}.")
 
     for name, paths in results.items():
-        add_images_row(
-            pdf,
-            f"Пример: {name}",
-            (paths["source"], paths["adaptive_gaussian"], paths["sauvola"]),
-        )
+        add_images_row(pdf, f"Пример: {name}", paths["strip"])
 
     pdf.add_page()
     add_title(pdf, "Наблюдения")
@@ -129,10 +187,12 @@ def main() -> None:
     out_pdf = base / "results" / "Lab2_report.pdf"
 
     params = {"block": 25, "c": 5.0, "k": 0.2, "r": 128.0}
-    results = process_images(src_dir, out_dir, params)
-    if not results:
-        raise RuntimeError("No images found to process.")
-    build_report(results, params, out_pdf)
+    # the strips only feed the PDF, so they are not left next to the saved results
+    with tempfile.TemporaryDirectory() as strip_dir:
+        results = process_images(src_dir, out_dir, Path(strip_dir), params)
+        if not results:
+            raise RuntimeError("No images found to process.")
+        build_report(results, params, out_pdf)
     print(f"Report saved to {out_pdf}")
 
 
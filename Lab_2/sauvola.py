@@ -0,0 +1,133 @@
+"""Sauvola binarisation shared by the GUI (app.py) and the report script (generate_report.py)."""
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # numba is optional: sauvola() then uses the OpenCV integral-image path
+    HAS_NUMBA = False
+    prange = range
+
+    def get_num_threads() -> int:
+        return 1
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+# the parallel kernel already uses every core, and Numba's default threading layer
+# must not be entered from several Python threads at once
+_KERNEL_LOCK = threading.Lock()
+
+
+def window_sum(ii: np.ndarray, blk: int) -> np.ndarray:
+    """Sums over blk x blk windows from an integral image, via its four corners."""
+    out = ii[blk:, blk:] - ii[:-blk, blk:]
+    out -= ii[blk:, :-blk]
+    out += ii[:-blk, :-blk]
+    return out
+
+
+@njit(cache=True)
+def _reflect(idx: int, n: int) -> int:
+    """BORDER_REFLECT_101 index, valid while the overshoot is smaller than n."""
+    if idx < 0:
+        return -idx
+    if idx >= n:
+        return 2 * (n - 1) - idx
+    return idx
+
+
+@njit(parallel=True, cache=True)
+def _sauvola_kernel(gray: np.ndarray, blk: int, k: float, r: float, n_bands: int, out: np.ndarray) -> np.ndarray:
+    """Single-pass Sauvola: each row band slides vertical column sums and a horizontal window over them.
+
+    The float32 steps mirror the NumPy path, so both give the same binary image.
+    """
+    h, w = gray.shape
+    half = blk // 2
+    area = blk * blk
+    scale = np.float32(k / (r * area))
+    shift = np.float32(1 - k)
+    area_f = np.float32(area)
+    for band in prange(n_bands):
+        row0 = band * h // n_bands
+        row1 = (band + 1) * h // n_bands
+        col_s = np.zeros(w, dtype=np.int64)
+        col_sq = np.zeros(w, dtype=np.int64)
+        for d in range(-half, half + 1):
+            rr = _reflect(row0 + d, h)
+            for j in range(w):
+                v = np.int64(gray[rr, j])
+                col_s[j] += v
+                col_sq[j] += v * v
+        for i in range(row0, row1):
+            if i > row0:
+                r_add = _reflect(i + half, h)
+                r_sub = _reflect(i - 1 - half, h)
+                for j in range(w):
+                    a = np.int64(gray[r_add, j])
+                    b = np.int64(gray[r_sub, j])
+                    col_s[j] += a - b
+                    col_sq[j] += a * a - b * b
+            s = 0
+            sq = 0
+            for d in range(-half, half + 1):
+                jj = _reflect(d, w)
+                s += col_s[jj]
+                sq += col_sq[jj]
+            for j in range(w):
+                if j > 0:
+                    c_add = _reflect(j + half, w)
+                    c_sub = _reflect(j - 1 - half, w)
+                    s += col_s[c_add] - col_s[c_sub]
+                    sq += col_sq[c_add] - col_sq[c_sub]
+                t = np.sqrt(np.float32(sq * area - s * s))
+                t = np.float32(t * scale)
+                t = np.float32(t + shift)
+                t = np.float32(np.float64(t) * s)
+                t = np.float32(t / area_f)
+                out[i, j] = 255 if gray[i, j] > t else 0
+    return out
+
+
+def sauvola(
+    gray: np.ndarray, block_size: int, k: float = 0.2, r: float = 128.0, dst: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Sauvola binarisation; the result goes into dst when it is a uint8 array of gray's shape."""
+    blk = max(3, block_size | 1)
+    half = blk // 2
+    if dst is None or dst.shape != gray.shape or dst.dtype != np.uint8:
+        dst = np.empty_like(gray)
+    if HAS_NUMBA and half < min(gray.shape):
+        n_bands = min(gray.shape[0], get_num_threads())
+        with _KERNEL_LOCK:
+            return _sauvola_kernel(np.ascontiguousarray(gray), blk, k, r, n_bands, dst)
+    area = blk * blk
+    # same border handling as boxFilter, so every window is full-size
+    padded = cv2.copyMakeBorder(gray, half, half, half, half, cv2.BORDER_REFLECT_101)
+    # int32 integrals may wrap on large images, but a window sum of squares still fits
+    # in int32 (up to 181x181), so the wrapped four-corner differences stay exact
+    depth = cv2.CV_32S if area * 255 * 255 < 2 ** 31 else cv2.CV_64F
+    s, sq = cv2.integral2(padded, sdepth=depth, sqdepth=depth)
+    s, sq = window_sum(s, blk), window_sum(sq, blk)
+    # area^2 * variance, exact in int64, so it is never negative
+    var = sq.astype(np.int64)
+    var *= area
+    s64 = s.astype(np.int64)
+    var -= np.multiply(s64, s64, out=s64)
+    # thresh = mean * (1 + k * (std / r - 1)) with mean = s / area and std = sqrt(var) / area
+    thresh = np.sqrt(var, dtype=np.float32)
+    thresh *= k / (r * area)
+    thresh += 1 - k
+    thresh *= s
+    thresh /= area
+    np.greater(gray, thresh, out=dst.view(np.bool_))
+    dst *= 255
+    return dst
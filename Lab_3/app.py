@@ -1,108 +1,233 @@
 import time
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:  # numba is optional: fall back to the NumPy / pure Python versions
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 
 Point = Tuple[int, int]
 
 
-def step_line(p0: Point, p1: Point) -> List[Point]:
-    x0, y0 = p0
-    x1, y1 = p1
+@njit(cache=True)
+def _step_line_kernel(x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
     dx, dy = x1 - x0, y1 - y0
     steps = max(abs(dx), abs(dy))
-    if steps == 0:
-        return [(x0, y0)]
-    pts: List[Point] = []
-    for i in range(steps + 1):
+    buf = np.empty((steps + 1, 2), dtype=np.int32)
+    buf[0, 0], buf[0, 1] = x0, y0
+    n = 1
+    for i in range(1, steps + 1):
         t = i / steps
         x = round(x0 + dx * t)
         y = round(y0 + dy * t)
-        if not pts or pts[-1] != (x, y):
-            pts.append((x, y))
-    return pts
+        if buf[n - 1, 0] != x or buf[n - 1, 1] != y:
+            buf[n, 0], buf[n, 1] = x, y
+            n += 1
+    return buf[:n]
 
 
-def dda_line(p0: Point, p1: Point) -> List[Point]:
-    x0, y0 = p0
-    x1, y1 = p1
+@njit(cache=True)
+def _dda_line_kernel(x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
     dx, dy = x1 - x0, y1 - y0
     steps = max(abs(dx), abs(dy))
+    buf = np.empty((steps + 1, 2), dtype=np.int32)
+    buf[0, 0], buf[0, 1] = x0, y0
     if steps == 0:
-        return [(x0, y0)]
+        return buf
     x_inc, y_inc = dx / steps, dy / steps
     x, y = float(x0), float(y0)
-    pts: List[Point] = []
-    for _ in range(steps + 1):
-        px, py = round(x), round(y)
-        if not pts or pts[-1] != (px, py):
-            pts.append((px, py))
+    n = 1
+    for _ in range(steps):
         x += x_inc
         y += y_inc
-    return pts
+        px, py = round(x), round(y)
+        if buf[n - 1, 0] != px or buf[n - 1, 1] != py:
+            buf[n, 0], buf[n, 1] = px, py
+            n += 1
+    return buf[:n]
+
+
+@njit(cache=True)
+def _bresenham_major_kernel(a0: int, b0: int, da: int, db: int, sa: int, sb: int, a_col: int) -> np.ndarray:
+    """Bresenham along a fixed major axis a (da >= db): one branch per pixel, for the minor step."""
+    buf = np.empty((da + 1, 2), dtype=np.int32)
+    b_col = 1 - a_col
+    a, b = a0, b0
+    err = (da - 1) // 2
+    for i in range(da + 1):
+        buf[i, a_col], buf[i, b_col] = a, b
+        a += sa
+        err += db
+        if err >= da:
+            err -= da
+            b += sb
+    return buf
+
+
+@njit(cache=True)
+def _bresenham_line_kernel(x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    # the octant is resolved once here instead of testing both axes on every step
+    if dx >= dy:
+        return _bresenham_major_kernel(x0, y0, dx, dy, sx, sy, 0)
+    return _bresenham_major_kernel(y0, x0, dy, dx, sy, sx, 1)
+
+
+@njit(cache=True)
+def _put(buf: np.ndarray, n: int, x: int, y: int) -> int:
+    buf[n, 0], buf[n, 1] = x, y
+    return n + 1
+
+
+@njit(cache=True)
+def _bresenham_circle_kernel(x0: int, y0: int, radius: int) -> np.ndarray:
+    x = 0
+    y = radius
+    d = 3 - 2 * radius
+    # the arc has at most radius + 1 points per octant
+    buf = np.empty((8 * (max(radius, 0) + 1), 2), dtype=np.int32)
+    n = 0
+    while y >= x:
+        # mirrors coincide on the axes (x == 0, or y == 0 for radius 0) and on the
+        # diagonal (x == y); only those are skipped, so every point is emitted once
+        n = _put(buf, n, x0 + x, y0 + y)
+        if x != 0:
+            n = _put(buf, n, x0 - x, y0 + y)
+        if y != 0:
+            n = _put(buf, n, x0 + x, y0 - y)
+            if x != 0:
+                n = _put(buf, n, x0 - x, y0 - y)
+        if x != y:
+            n = _put(buf, n, x0 + y, y0 + x)
+            n = _put(buf, n, x0 - y, y0 + x)
+            if x != 0:
+                n = _put(buf, n, x0 + y, y0 - x)
+                n = _put(buf, n, x0 - y, y0 - x)
+        if d < 0:
+            d += 4 * x + 6
+        else:
+            d += 4 * (x - y) + 10
+            y -= 1
+        x += 1
+    return buf[:n]
+
+
+def warmup_kernels() -> None:
+    """Compile the JIT kernels up front so the first timed draw does not include compilation."""
+    if not HAS_NUMBA:
+        return
+    _step_line_kernel(0, 0, 1, 1)
+    _dda_line_kernel(0, 0, 1, 1)
+    _bresenham_line_kernel(0, 0, 1, 1)
+    _bresenham_circle_kernel(0, 0, 1)
+
+
+def _dedupe_consecutive(pts: np.ndarray) -> np.ndarray:
+    keep = np.concatenate(([True], np.any(np.diff(pts, axis=0) != 0, axis=1)))
+    return pts[keep]
+
+
+def step_line(p0: Point, p1: Point) -> np.ndarray:
+    x0, y0 = p0
+    x1, y1 = p1
+    if HAS_NUMBA:
+        return _step_line_kernel(x0, y0, x1, y1)
+    dx, dy = x1 - x0, y1 - y0
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return np.array([(x0, y0)], dtype=np.int32)
+    t = np.arange(steps + 1) / steps
+    xs = np.round(x0 + dx * t).astype(np.int32)
+    ys = np.round(y0 + dy * t).astype(np.int32)
+    return _dedupe_consecutive(np.column_stack((xs, ys)))
 
 
-def bresenham_line(p0: Point, p1: Point) -> List[Point]:
+def dda_line(p0: Point, p1: Point) -> np.ndarray:
     x0, y0 = p0
     x1, y1 = p1
+    if HAS_NUMBA:
+        return _dda_line_kernel(x0, y0, x1, y1)
+    dx, dy = x1 - x0, y1 - y0
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return np.array([(x0, y0)], dtype=np.int32)
+    x_inc, y_inc = dx / steps, dy / steps
+    # cumsum adds sequentially, so the float error accumulates exactly as in x += x_inc
+    xs = np.full(steps + 1, x_inc)
+    ys = np.full(steps + 1, y_inc)
+    xs[0], ys[0] = x0, y0
+    xs = np.round(np.cumsum(xs)).astype(np.int32)
+    ys = np.round(np.cumsum(ys)).astype(np.int32)
+    return _dedupe_consecutive(np.column_stack((xs, ys)))
+
+
+def bresenham_line(p0: Point, p1: Point) -> np.ndarray:
+    x0, y0 = p0
+    x1, y1 = p1
+    if HAS_NUMBA:
+        return _bresenham_line_kernel(x0, y0, x1, y1)
     dx = abs(x1 - x0)
     dy = abs(y1 - y0)
     sx = 1 if x0 < x1 else -1
     sy = 1 if y0 < y1 else -1
-    err = dx - dy
-    pts: List[Point] = []
-    while True:
-        pts.append((x0, y0))
-        if x0 == x1 and y0 == y1:
-            break
-        e2 = 2 * err
-        if e2 > -dy:
-            err -= dy
-            x0 += sx
-        if e2 < dx:
-            err += dx
-            y0 += sy
-    return pts
-
-
-def bresenham_circle(center: Point, radius: int) -> List[Point]:
+    # closed form of the error accumulator: one step per pixel along the major axis,
+    # the minor axis advances once the accumulated error crosses half a pixel
+    major, minor = max(dx, dy), min(dx, dy)
+    k = np.arange(major + 1, dtype=np.int32)
+    m = (k * minor + (major - 1) // 2) // major if major else k
+    if dx >= dy:
+        xs, ys = x0 + sx * k, y0 + sy * m
+    else:
+        xs, ys = x0 + sx * m, y0 + sy * k
+    return np.column_stack((xs, ys)).astype(np.int32)
+
+
+def bresenham_circle(center: Point, radius: int) -> np.ndarray:
     x0, y0 = center
+    if HAS_NUMBA:
+        return _bresenham_circle_kernel(x0, y0, radius)
+    # item writes into an array are slow in plain Python: collect flat x, y values in a
+    # list and convert once; same emission order as the kernel, each point once
+    coords: List[int] = []
+    emit = coords.extend
     x = 0
     y = radius
     d = 3 - 2 * radius
-    pts: List[Point] = []
-
-    def plot(cx: int, cy: int, px: int, py: int) -> None:
-        pts.extend(
-            [
-                (cx + px, cy + py),
-                (cx - px, cy + py),
-                (cx + px, cy - py),
-                (cx - px, cy - py),
-                (cx + py, cy + px),
-                (cx - py, cy + px),
-                (cx + py, cy - px),
-                (cx - py, cy - px),
-            ]
-        )
-
     while y >= x:
-        plot(x0, y0, x, y)
+        if x == 0:
+            if y == 0:
+                emit((x0, y0))
+            else:
+                emit((x0, y0 + y, x0, y0 - y, x0 + y, y0, x0 - y, y0))
+        elif x == y:
+            emit((x0 + x, y0 + y, x0 - x, y0 + y, x0 + x, y0 - y, x0 - x, y0 - y))
+        else:
+            emit((
+                x0 + x, y0 + y, x0 - x, y0 + y, x0 + x, y0 - y, x0 - x, y0 - y,
+                x0 + y, y0 + x, x0 - y, y0 + x, x0 + y, y0 - x, x0 - y, y0 - x,
+            ))
         if d < 0:
             d += 4 * x + 6
         else:
             d += 4 * (x - y) + 10
             y -= 1
         x += 1
-    # remove duplicates while preserving order
-    seen = set()
-    uniq: List[Point] = []
-    for p in pts:
-        if p not in seen:
-            uniq.append(p)
-            seen.add(p)
-    return uniq
+    return np.array(coords, dtype=np.int32).reshape(-1, 2)
 
 
 class RasterApp:
@@ -128,7 +253,10 @@ class RasterApp:
         self.info_var = tk.StringVar(value="Готово.")
 
         self.canvas = tk.Canvas(self.root, bg=self.bg_color, highlightthickness=0)
+        self._raster: Optional[tk.PhotoImage] = None
+        self._raster_item: Optional[int] = None
 
+        warmup_kernels()
         self._build_ui()
         self._redraw()
 
@@ -184,6 +312,9 @@ class RasterApp:
         w, h = self._canvas_size()
         self.canvas.config(width=w, height=h)
         self.canvas.delete("all")
+        # pixels live in one image under the grid lines instead of one canvas item per cell
+        self._raster = None
+        self._raster_item = self.canvas.create_image(1, 1, anchor="nw")
         self._draw_grid()
 
     def _draw_grid(self) -> None:
@@ -206,22 +337,22 @@ class RasterApp:
         for y in range(0, rows, max(1, rows // 10)):
             self.canvas.create_text(4, h - y * cell - 2, text=str(y), anchor="sw", fill="#556")
 
-    def _to_canvas(self, p: Point) -> Tuple[int, int, int, int]:
-        x, y = p
-        cell = self.cell.get()
+    def _draw_points(self, pts: np.ndarray, color: str) -> None:
         cols, rows = self._grid_size()
-        if x < 0 or y < 0 or x >= cols or y >= rows:
-            return -1, -1, -1, -1
-        left = x * cell + 1
-        top = (rows - 1 - y) * cell + 1
-        return left, top, left + cell - 1, top + cell - 1
-
-    def _draw_points(self, pts: List[Point], color: str) -> None:
-        for p in pts:
-            x1, y1, x2, y2 = self._to_canvas(p)
-            if x1 == -1:
-                continue
-            self.canvas.create_rectangle(x1, y1, x2, y2, outline=color, fill=color)
+        pts = np.asarray(pts).reshape(-1, 2)
+        xs, ys = pts[:, 0], pts[:, 1]
+        pts = pts[(xs >= 0) & (ys >= 0) & (xs < cols) & (ys < rows)]
+        if not len(pts):
+            return
+        # the whole grid goes to Tk as one {row} {row} ... colour string at one pixel per cell,
+        # then zoom() scales it up to the cell size; the grid lines drawn on top separate the cells
+        cells = np.full((rows, cols), self.bg_color, dtype=object)
+        cells[rows - 1 - pts[:, 1], pts[:, 0]] = color
+        data = " ".join("{" + " ".join(row) + "}" for row in cells.tolist())
+        small = tk.PhotoImage(width=cols, height=rows)
+        small.put(data)
+        self._raster = small.zoom(self.cell.get())
+        self.canvas.itemconfig(self._raster_item, image=self._raster)
 
     # Actions
     def clear(self) -> None:
@@ -3,17 +3,60 @@ import tkinter as tk
 from tkinter import filedialog, ttk
 from typing import List, Optional, Tuple
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # numba is optional: liang_barsky_batch() then uses the NumPy version
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 
 Point = Tuple[float, float]
 Segment = Tuple[float, float, float, float]
 Rect = Tuple[float, float, float, float]
 
+SH_NUMPY_MIN = 16  # polygons with more vertices are clipped by sutherland_hodgman_np
+
 
 # ---------- Algorithms ----------
+def outcode(x: float, y: float, xmin: float, ymin: float, xmax: float, ymax: float) -> int:
+    """Cohen-Sutherland region code: bits 1/2/4/8 for left/right/below/above the rectangle."""
+    code = 0
+    if x < xmin:
+        code |= 1
+    elif x > xmax:
+        code |= 2
+    if y < ymin:
+        code |= 4
+    elif y > ymax:
+        code |= 8
+    return code
+
+
+# the scalar liang_barsky() runs in plain Python, where a dispatcher call would cost more than
+# the test itself; only the parallel kernel uses the compiled copy
+_outcode = njit(cache=True)(outcode)
+
+
 def liang_barsky(rect: Rect, seg: Segment) -> Optional[Segment]:
     """Return clipped segment or None; rect = (xmin, ymin, xmax, ymax)."""
     xmin, ymin, xmax, ymax = rect
     x0, y0, x1, y1 = seg
+    # trivial cases first: both ends inside, or both beyond the same edge
+    c0 = outcode(x0, y0, xmin, ymin, xmax, ymax)
+    c1 = outcode(x1, y1, xmin, ymin, xmax, ymax)
+    if (c0 | c1) == 0:
+        return x0, y0, x1, y1
+    if c0 & c1:
+        return None
     dx, dy = x1 - x0, y1 - y0
     p = [-dx, dx, -dy, dy]
     q = [x0 - xmin, xmax - x0, y0 - ymin, ymax - y0]
@@ -23,7 +66,7 @@ def liang_barsky(rect: Rect, seg: Segment) -> Optional[Segment]:
             if qi < 0:
                 return None
             continue
-        t = -qi / pi
+        t = qi / pi
         if pi < 0:
             u1 = max(u1, t)
         else:
@@ -35,9 +78,112 @@ def liang_barsky(rect: Rect, seg: Segment) -> Optional[Segment]:
     return cx0, cy0, cx1, cy1
 
 
+@njit(cache=True)
+def _lb_edge(p: float, q: float, u1: float, u2: float) -> Tuple[float, float, bool]:
+    """One edge of Liang-Barsky: narrow [u1, u2], or report the segment outside."""
+    if p == 0:
+        return u1, u2, q >= 0
+    t = q / p
+    if p < 0:
+        if t > u1:
+            u1 = t
+    elif t < u2:
+        u2 = t
+    return u1, u2, True
+
+
+@njit(cache=True, parallel=True)
+def _lb_kernel(
+    xmin: float, ymin: float, xmax: float, ymax: float, segs: np.ndarray, out: np.ndarray, mask: np.ndarray
+) -> None:
+    for i in prange(segs.shape[0]):
+        x0, y0, x1, y1 = segs[i, 0], segs[i, 1], segs[i, 2], segs[i, 3]
+        c0 = _outcode(x0, y0, xmin, ymin, xmax, ymax)
+        c1 = _outcode(x1, y1, xmin, ymin, xmax, ymax)
+        if (c0 | c1) == 0 or (c0 & c1) != 0:
+            mask[i] = (c0 & c1) == 0
+            out[i, 0], out[i, 1], out[i, 2], out[i, 3] = x0, y0, x1, y1
+            continue
+        dx, dy = x1 - x0, y1 - y0
+        u1, u2, ok_l = _lb_edge(-dx, x0 - xmin, 0.0, 1.0)
+        u1, u2, ok_r = _lb_edge(dx, xmax - x0, u1, u2)
+        u1, u2, ok_b = _lb_edge(-dy, y0 - ymin, u1, u2)
+        u1, u2, ok_t = _lb_edge(dy, ymax - y0, u1, u2)
+        mask[i] = ok_l and ok_r and ok_b and ok_t and u1 <= u2
+        out[i, 0], out[i, 1] = x0 + u1 * dx, y0 + u1 * dy
+        out[i, 2], out[i, 3] = x0 + u2 * dx, y0 + u2 * dy
+
+
+def warmup_kernels() -> None:
+    """Compile the JIT kernels up front so the first timed clip does not include compilation."""
+    if HAS_NUMBA:
+        liang_barsky_batch((0.0, 0.0, 1.0, 1.0), np.zeros((1, 4)))
+
+
+def outcodes(x: np.ndarray, y: np.ndarray, rect: Rect) -> np.ndarray:
+    """outcode() for arrays of points."""
+    xmin, ymin, xmax, ymax = rect
+    codes = (x < xmin).astype(np.uint8)
+    codes |= (x > xmax).astype(np.uint8) << 1
+    codes |= (y < ymin).astype(np.uint8) << 2
+    codes |= (y > ymax).astype(np.uint8) << 3
+    return codes
+
+
+def _liang_barsky_np(rect: Rect, segs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    xmin, ymin, xmax, ymax = rect
+    x0, y0 = segs[:, 0], segs[:, 1]
+    dx, dy = segs[:, 2] - x0, segs[:, 3] - y0
+    p = np.stack([-dx, dx, -dy, dy], axis=1)
+    q = np.stack([x0 - xmin, xmax - x0, y0 - ymin, ymax - y0], axis=1)
+    # parallel to an edge and outside it
+    reject = ((p == 0) & (q < 0)).any(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = q / p
+    # entering edges raise u1, leaving edges lower u2; p == 0 contributes to neither
+    u1 = np.where(p < 0, t, 0.0).max(axis=1)
+    u2 = np.where(p > 0, t, 1.0).min(axis=1)
+    visible = ~reject & (u1 <= u2)
+    clipped = np.stack([x0 + u1 * dx, y0 + u1 * dy, x0 + u2 * dx, y0 + u2 * dy], axis=1)
+    return visible, clipped
+
+
+def liang_barsky_batch(rect: Rect, segs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Liang-Barsky over an (N, 4) array of segments at once.
+
+    Returns (visible, clipped): a boolean mask and the (N, 4) clipped coordinates,
+    which are only meaningful where visible is True.
+    """
+    rect = tuple(float(v) for v in rect)
+    segs = np.ascontiguousarray(segs, dtype=np.float64).reshape(-1, 4)
+    if HAS_NUMBA:
+        clipped = np.empty_like(segs)
+        visible = np.empty(len(segs), dtype=np.bool_)
+        _lb_kernel(*rect, segs, clipped, visible)
+        return visible, clipped
+    # only segments that are neither trivially inside nor trivially outside need clipping
+    c0 = outcodes(segs[:, 0], segs[:, 1], rect)
+    c1 = outcodes(segs[:, 2], segs[:, 3], rect)
+    visible = (c0 & c1) == 0
+    clipped = segs.copy()
+    partial = np.flatnonzero(visible & ((c0 | c1) != 0))
+    visible[partial], clipped[partial] = _liang_barsky_np(rect, segs[partial])
+    return visible, clipped
+
+
 def sutherland_hodgman(subject: List[Point], clip_rect: Rect) -> List[Point]:
     """Clip polygon by rectangle; returns list of points (may be empty)."""
     xmin, ymin, xmax, ymax = clip_rect
+    if not subject:
+        return []
+    # bounding box fully inside or fully outside the window: nothing to clip
+    xs = [p[0] for p in subject]
+    ys = [p[1] for p in subject]
+    mnx, mxx, mny, mxy = min(xs), max(xs), min(ys), max(ys)
+    if mnx >= xmin and mxx <= xmax and mny >= ymin and mxy <= ymax:
+        return list(subject)
+    if mxx < xmin or mnx > xmax or mxy < ymin or mny > ymax:
+        return []
 
     def inside(p: Point, edge: str) -> bool:
         x, y = p
@@ -83,6 +229,52 @@ def sutherland_hodgman(subject: List[Point], clip_rect: Rect) -> List[Point]:
     return res
 
 
+def _clip_edge_np(
+    pts: np.ndarray, codes: np.ndarray, axis: int, bound: float, bit: int, rect: Rect
+) -> Tuple[np.ndarray, np.ndarray]:
+    """One Sutherland-Hodgman pass against the window side whose outcode bit is bit."""
+    prev = np.roll(pts, 1, axis=0)
+    cur_in = (codes & bit) == 0
+    crossing = cur_in != np.roll(cur_in, 1)
+    # each vertex emits the crossing point (if the edge prev -> cur crosses) and then itself (if inside)
+    counts = crossing.astype(np.intp) + cur_in
+    starts = np.cumsum(counts) - counts
+    total = int(counts.sum())
+    out = np.empty((total, 2))
+    out_codes = np.empty(total, dtype=np.uint8)
+    p1, p2 = prev[crossing], pts[crossing]
+    t = (bound - p1[:, axis]) / (p2[:, axis] - p1[:, axis])
+    hit = np.empty_like(p1)
+    hit[:, axis] = bound
+    hit[:, 1 - axis] = p1[:, 1 - axis] + t * (p2[:, 1 - axis] - p1[:, 1 - axis])
+    out[starts[crossing]] = hit
+    out_codes[starts[crossing]] = outcodes(hit[:, 0], hit[:, 1], rect)
+    kept = (starts + crossing)[cur_in]
+    out[kept] = pts[cur_in]
+    out_codes[kept] = codes[cur_in]
+    return out, out_codes
+
+
+def sutherland_hodgman_np(subject: np.ndarray, clip_rect: Rect) -> np.ndarray:
+    """sutherland_hodgman() on an (N, 2) array; returns an (M, 2) array (M may be 0)."""
+    xmin, ymin, xmax, ymax = clip_rect
+    res = np.asarray(subject, dtype=np.float64).reshape(-1, 2)
+    if not len(res):
+        return res
+    (mnx, mny), (mxx, mxy) = res.min(axis=0), res.max(axis=0)
+    if mnx >= xmin and mxx <= xmax and mny >= ymin and mxy <= ymax:
+        return res
+    if mxx < xmin or mnx > xmax or mxy < ymin or mny > ymax:
+        return res[:0]
+    # outcodes are computed once for the input; each pass only adds codes for its new intersection points
+    codes = outcodes(res[:, 0], res[:, 1], clip_rect)
+    for axis, bound, bit in ((0, xmin, 1), (0, xmax, 2), (1, ymin, 4), (1, ymax, 8)):
+        if not len(res):
+            break
+        res, codes = _clip_edge_np(res, codes, axis, bound, bit, clip_rect)
+    return res
+
+
 # ---------- GUI ----------
 class ClipApp:
     def __init__(self) -> None:
@@ -100,18 +292,25 @@ class ClipApp:
         self.cols = tk.IntVar(value=24)
         self.rows = tk.IntVar(value=18)
 
-        self.segments: List[Segment] = [
-            (0, 0, 18, 12),
-            (3, 15, 16, -1),
-            (5, 5, 5, 14),
-            (10, 0, 20, 12),
-            (12, 7, 4, 9),
-        ]
+        # (N, 4) rows of x1 y1 x2 y2, clipped in one batch
+        self.segments = np.array(
+            [
+                (0, 0, 18, 12),
+                (3, 15, 16, -1),
+                (5, 5, 5, 14),
+                (10, 0, 20, 12),
+                (12, 7, 4, 9),
+            ],
+            dtype=np.float64,
+        )
         self.poly_points = tk.StringVar(value="3 3, 16 4, 18 12, 8 14, 4 10")
 
         self.info = tk.StringVar(value="Готово.")
 
         self.canvas = tk.Canvas(self.root, bg="#f9fbff", highlightthickness=0)
+        self._grid_key: Optional[Tuple[int, int, int]] = None
+        self._grid_image: Optional[tk.PhotoImage] = None
+        warmup_kernels()
         self._build_ui()
         self._redraw()
 
@@ -169,12 +368,17 @@ class ClipApp:
         grid_color = "#d0d8e6"
         axis_color = "#8a9ab3"
 
-        for x in range(cols + 1):
-            px = x * cell + 0.5
-            self.canvas.create_line(px, 0, px, h, fill=grid_color)
-        for y in range(rows + 1):
-            py = h - y * cell + 0.5
-            self.canvas.create_line(0, py, w, py, fill=grid_color)
+        # the grid lines only change with the cell size or the grid size: they are painted once
+        # into a transparent image and reused, so a redraw costs one canvas item instead of cols + rows
+        key = (cols, rows, cell)
+        if self._grid_key != key:
+            img = tk.PhotoImage(width=w + 1, height=h + 1)
+            for x in range(cols + 1):
+                img.put(grid_color, to=(x * cell, 0, x * cell + 1, h))
+            for y in range(rows + 1):
+                img.put(grid_color, to=(0, h - y * cell, w, h - y * cell + 1))
+            self._grid_image, self._grid_key = img, key
+        self.canvas.create_image(0, 0, anchor="nw", image=self._grid_image)
 
         self.canvas.create_line(0, h + 0.5, w, h + 0.5, fill=axis_color, width=2)
         self.canvas.create_line(0.5, 0, 0.5, h, fill=axis_color, width=2)
@@ -201,11 +405,21 @@ class ClipApp:
         x2, y2 = self._to_canvas((xmax, ymax))
         self.canvas.create_rectangle(x1, y1, x2, y2, outline="#1f77b4", width=2)
 
-    def _draw_segments(self, segs: List[Segment], color: str, width: int = 2) -> None:
-        for x0, y0, x1, y1 in segs:
-            cx0, cy0 = self._to_canvas((x0, y0))
-            cx1, cy1 = self._to_canvas((x1, y1))
-            self.canvas.create_line(cx0, cy0, cx1, cy1, fill=color, width=width)
+    def _draw_segments(self, segs: np.ndarray, color: str, width: int = 2) -> None:
+        segs = np.asarray(segs, dtype=np.float64).reshape(-1, 4)
+        if not len(segs):
+            return
+        cell = self.scale.get()
+        _, rows = self._grid_size()
+        pts = np.empty_like(segs)
+        pts[:, 0::2] = segs[:, 0::2] * cell
+        pts[:, 1::2] = (rows - segs[:, 1::2]) * cell
+        # one Tcl script with a "create line" per segment: a single round trip into Tk
+        # instead of one create_line() call, with its own argument conversion, per segment
+        opts = f"-fill {color} -width {width}"
+        cmd = f"{self.canvas} create line"
+        script = "\n".join(f"{cmd} {x0!r} {y0!r} {x1!r} {y1!r} {opts}" for x0, y0, x1, y1 in pts.tolist())
+        self.canvas.tk.eval(script)
 
     def _draw_polygon(self, pts: List[Point], color: str, width: int = 2, fill: Optional[str] = None) -> None:
         if len(pts) < 2:
@@ -232,10 +446,10 @@ class ClipApp:
             with open(path, "r", encoding="utf-8") as f:
                 lines = [l.strip() for l in f if l.strip()]
             n = int(lines[0])
-            segs: List[Segment] = []
-            for line in lines[1 : n + 1]:
-                x1, y1, x2, y2 = map(float, line.split())
-                segs.append((x1, y1, x2, y2))
+            # all segment rows are parsed in one C-level pass straight into an (n, 4) array
+            segs = np.loadtxt(lines[1 : n + 1], dtype=np.float64, ndmin=2) if n > 0 else np.empty((0, 4))
+            if segs.shape != (n, 4):
+                raise ValueError(f"ожидалось {n} строк по 4 числа")
             xmin, ymin, xmax, ymax = map(float, lines[n + 1].split())
             self.segments = segs
             self.rect_vars["xmin"].set(xmin)
@@ -255,28 +469,36 @@ class ClipApp:
             self.rect_vars["ymax"].get(),
         )
         start = time.perf_counter()
-        clipped = []
-        for seg in self.segments:
-            res = liang_barsky(rect, seg)
-            if res is not None:
-                clipped.append(res)
+        visible, clipped = liang_barsky_batch(rect, self.segments)
+        clipped = clipped[visible]
         elapsed = (time.perf_counter() - start) * 1000
         self._redraw()
         self._draw_segments(self.segments, color="#c0c6d4", width=2)
         self._draw_segments(clipped, color="#e4572e", width=3)
         self.info.set(f"Отрезков: {len(self.segments)}, видимых: {len(clipped)}, {elapsed:.3f} мс")
 
-    def _parse_polygon(self) -> List[Point]:
+    def _parse_polygon(self) -> np.ndarray:
+        """Polygon vertices from the entry as an (N, 2) array."""
         raw = self.poly_points.get()
+        groups = raw.split(",")
+        # with exactly one pair in every comma group the numbers are parsed in one pass; anything
+        # else goes through the per-token loop, which skips malformed pairs instead of misaligning the rest
+        if all(len(token.split()) == 2 for token in groups):
+            try:
+                arr = np.fromstring(raw.replace(",", " "), dtype=np.float64, sep=" ")
+            except ValueError:  # a token that is not a number
+                arr = np.empty(0)
+            if arr.size == 2 * len(groups):
+                return arr.reshape(-1, 2)
         pts: List[Point] = []
-        for token in raw.split(","):
+        for token in groups:
             parts = token.strip().split()
             if len(parts) == 2:
                 try:
                     pts.append((float(parts[0]), float(parts[1])))
                 except ValueError:
                     continue
-        return pts
+        return np.array(pts, dtype=np.float64).reshape(-1, 2)
 
     def clip_polygon(self) -> None:
         subject = self._parse_polygon()
@@ -290,10 +512,14 @@ class ClipApp:
             self.rect_vars["ymax"].get(),
         )
         start = time.perf_counter()
-        clipped = sutherland_hodgman(subject, rect)
+        if len(subject) > SH_NUMPY_MIN:
+            clipped = sutherland_hodgman_np(subject, rect).tolist()
+        else:
+            # for a handful of vertices the array setup costs more than the loop itself
+            clipped = sutherland_hodgman(subject.tolist(), rect)
         elapsed = (time.perf_counter() - start) * 1000
         self._redraw()
-        self._draw_polygon(subject, color="#7e9ab8", width=2)
+        self._draw_polygon(subject.tolist(), color="#7e9ab8", width=2)
         self._draw_rect()
         if clipped:
             self._draw_polygon(clipped, color="#e4572e", width=3, fill="#f5a07a")
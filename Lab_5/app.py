@@ -1,7 +1,10 @@
 import math
 import tkinter as tk
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 Vec3 = Tuple[float, float, float]
 Face = Tuple[int, int, int, int]
@@ -36,6 +39,55 @@ def normal(a: Vec3, b: Vec3, c: Vec3) -> Vec3:
     return nx / length, ny / length, nz / length
 
 
+def face_normals(verts: np.ndarray, tri: np.ndarray) -> np.ndarray:
+    """normal() for every face at once; tri holds the first three vertex indices of each face."""
+    a, b, c = verts[tri[:, 0]], verts[tri[:, 1]], verts[tri[:, 2]]
+    n = np.cross(b - a, c - a)
+    length = np.linalg.norm(n, axis=1, keepdims=True)
+    length[length == 0] = 1.0
+    n /= length
+    return n
+
+
+def outward_signs(verts: np.ndarray, faces: Sequence[Face]) -> np.ndarray:
+    """+1 for faces whose winding gives an outward normal, -1 for faces wound the other way.
+
+    Windings are first made consistent across shared edges; each closed part is then
+    flipped as a whole if its signed volume comes out negative.
+    """
+    def edges(face: Face) -> List[Tuple[int, int]]:
+        return list(zip(face, face[1:] + face[:1]))
+
+    edge_faces: Dict[Tuple[int, int], List[int]] = {}
+    for f, face in enumerate(faces):
+        for a, b in edges(face):
+            edge_faces.setdefault((min(a, b), max(a, b)), []).append(f)
+
+    signs = np.zeros(len(faces), dtype=np.int64)
+    for seed in range(len(faces)):
+        if signs[seed]:
+            continue
+        signs[seed] = 1
+        part, stack = [seed], [seed]
+        while stack:
+            f = stack.pop()
+            for a, b in edges(faces[f]):
+                for g in edge_faces[(min(a, b), max(a, b))]:
+                    if signs[g]:
+                        continue
+                    # consistently wound neighbours walk their shared edge in opposite directions
+                    signs[g] = -signs[f] if (a, b) in edges(faces[g]) else signs[f]
+                    part.append(g)
+                    stack.append(g)
+        volume = 0.0
+        for f in part:
+            v = verts[list(faces[f])]
+            volume += signs[f] * sum(np.linalg.det(v[[0, i, i + 1]]) for i in range(1, len(v) - 1))
+        if volume < 0:
+            signs[part] *= -1
+    return signs
+
+
 def project(v: Vec3, angle: float) -> Tuple[float, float, float]:
     """Orthographic projection with camera rotated around Y by angle."""
     ca, sa = math.cos(angle), math.sin(angle)
@@ -45,14 +97,46 @@ def project(v: Vec3, angle: float) -> Tuple[float, float, float]:
     return x_cam, y, z_cam
 
 
+def rotation_matrix(rx: float, ry: float, rz: float) -> np.ndarray:
+    """3x3 matrix of rotate(): about X, then Y, then Z."""
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    rot_x = np.array([[1.0, 0.0, 0.0], [0.0, cx, -sx], [0.0, sx, cx]])
+    rot_y = np.array([[cy, 0.0, sy], [0.0, 1.0, 0.0], [-sy, 0.0, cy]])
+    rot_z = np.array([[cz, -sz, 0.0], [sz, cz, 0.0], [0.0, 0.0, 1.0]])
+    return rot_z @ rot_y @ rot_x
+
+
+def camera_matrix(angle: float) -> np.ndarray:
+    """3x3 matrix of project(): camera rotated around Y by angle."""
+    ca, sa = math.cos(angle), math.sin(angle)
+    return np.array([[ca, 0.0, sa], [0.0, 1.0, 0.0], [-sa, 0.0, ca]])
+
+
+_HEX = tuple(f"{i:02x}" for i in range(256))  # channel value -> two hex digits
+
+
 def shade(color: Tuple[int, int, int], n: Vec3, light: Vec3 = (0.5, 0.7, 1.0)) -> str:
     dot = max(0.2, min(1.0, n[0] * light[0] + n[1] * light[1] + n[2] * light[2]))
     r, g, b = [min(255, int(c * dot)) for c in color]
-    return f"#{r:02x}{g:02x}{b:02x}"
+    return "#" + _HEX[r] + _HEX[g] + _HEX[b]
+
+
+def shade_batch(color: Tuple[int, int, int], normals: np.ndarray, light: Vec3 = (0.5, 0.7, 1.0)) -> List[str]:
+    """shade() for an (F, 3) array of normals at once."""
+    dot = np.clip(normals @ np.asarray(light), 0.2, 1.0)
+    rgb = np.minimum(255, (np.asarray(color, dtype=np.float64) * dot[:, None]).astype(np.int64))
+    return ["#" + _HEX[r] + _HEX[g] + _HEX[b] for r, g, b in rgb.tolist()]
 
 
-def build_letter_r(depth: float = 1.0) -> Tuple[List[Vec3], List[Face]]:
-    """Return vertices and quad faces for an extruded 'R' (Р)."""
+@lru_cache(maxsize=8)
+def build_letter_r(depth: float = 1.0) -> Tuple[Tuple[Vec3, ...], Tuple[Face, ...]]:
+    """Return vertices and quad faces for an extruded 'R' (Р).
+
+    The model only depends on depth, so it is built once per depth and returned as tuples,
+    which callers cannot modify.
+    """
     # Simple contour without self-intersections (clockwise)
     contour = [
         (0.0, 0.0),
@@ -82,7 +166,7 @@ def build_letter_r(depth: float = 1.0) -> Tuple[List[Vec3], List[Face]]:
     for i in range(n_contour):
         a = i
         b = (i + 1) % n_contour
-        faces.append((a, b, b + n_contour, a + n_contour))
+        faces.append((a, b, b + n_contour + n_inner, a + n_contour + n_inner))
     # Side faces for inner hole (reverse winding for correct normals)
     for i in range(n_inner):
         a_front = n_contour + i
@@ -99,7 +183,7 @@ def build_letter_r(depth: float = 1.0) -> Tuple[List[Vec3], List[Face]]:
     faces.append(tuple(back_start + i for i in range(n_contour)))
     faces.append(tuple(back_inner_start + i for i in range(n_inner)))
 
-    return verts, faces
+    return tuple(verts), tuple(faces)
 
 
 @dataclass
@@ -122,20 +206,50 @@ class LetterApp:
 
         self.transform = Transform(tx=0.0, ty=0.0, tz=0.0, rx=0.3, ry=-0.8, rz=0.0, scale=55.0)
         self.cam_angle = tk.DoubleVar(value=0.6)
-        self.base_verts, self.faces = build_letter_r(depth=1.2)
-        self._center_model()
+        verts, self.faces = build_letter_r(depth=1.2)
+        self._center_model(verts)
+        self._init_model()
 
+        self._pending_render: Optional[str] = None
+        self._view_key: Optional[Tuple[float, float, float, float]] = None
+        self._view_cam = self._view_rot = np.eye(3)
         self._build_controls()
+        self._create_face_items()
         self.render()
 
-    def _center_model(self) -> None:
-        xs = [v[0] for v in self.base_verts]
-        ys = [v[1] for v in self.base_verts]
-        zs = [v[2] for v in self.base_verts]
-        cx = (min(xs) + max(xs)) / 2
-        cy = (min(ys) + max(ys)) / 2
-        cz = (min(zs) + max(zs)) / 2
-        self.base_verts = [(x - cx, y - cy, z - cz) for x, y, z in self.base_verts]
+    def _center_model(self, model_verts: Sequence[Vec3]) -> None:
+        """Store the model centred on its bounding box as base_xyz, the vertices render() works from."""
+        verts = np.asarray(model_verts, dtype=np.float64)
+        center = (verts.min(axis=0) + verts.max(axis=0)) / 2
+        # structure-of-arrays: rows are the contiguous x, y and z coordinates of all vertices
+        self.base_xyz = np.ascontiguousarray((verts - center).T)
+
+    def _init_model(self) -> None:
+        """Array views of the faces that render() reuses every frame."""
+        # faces have 4 or 8 vertices: keep them flattened, with the start offset of each face
+        sizes = np.array([len(face) for face in self.faces])
+        self.face_index = np.concatenate([np.asarray(face) for face in self.faces])
+        self.face_starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        self.face_sizes = sizes
+        # the normal of a planar face only needs its first three vertices
+        self.face_tri = np.array([face[:3] for face in self.faces])
+        # rotations keep normals rigid, so model-space normals only need rotating each frame
+        self.face_model_normals = face_normals(self.base_xyz.T, self.face_tri)
+        # flips the stored normals outward, for culling only: shading keeps the stored windings
+        self.face_outward = outward_signs(self.base_xyz.T, self.faces)
+        # positions of each face's x, y pairs in the interleaved screen coordinate array
+        self.face_coord_index = np.stack((2 * self.face_index, 2 * self.face_index + 1), axis=1).ravel()
+        self.face_coord_slices = [
+            slice(2 * start, 2 * (start + n)) for start, n in zip(self.face_starts.tolist(), sizes.tolist())
+        ]
+
+    def _create_face_items(self) -> None:
+        """One persistent polygon per face; render() only moves, recolours and restacks them."""
+        self.face_items = [
+            self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill="", outline="#1f2a44", width=1.2) for _ in self.faces
+        ]
+        self.face_fills: List[str] = [""] * len(self.faces)
+        self.face_hidden: List[bool] = [False] * len(self.faces)
 
     def _build_controls(self) -> None:
         panel = tk.Frame(self.root, padx=10, pady=8)
@@ -162,7 +276,7 @@ class LetterApp:
 
         tk.Label(panel, text="Поворот камеры").pack(anchor="w", pady=(8, 0))
         cam_scale = tk.Scale(panel, from_=-math.pi, to=math.pi, orient="horizontal", resolution=0.05,
-                             length=200, variable=self.cam_angle, command=lambda _: self.render())
+                             length=200, variable=self.cam_angle, command=lambda _: self.schedule_render())
         cam_scale.pack(anchor="w")
 
         tk.Button(panel, text="Сбросить", command=self.reset).pack(anchor="w", pady=8)
@@ -178,6 +292,15 @@ class LetterApp:
                 lbl.config(text=f"{math.degrees(value):.0f}")
             else:
                 lbl.config(text=f"{value:.1f}")
+        self.schedule_render()
+
+    def schedule_render(self) -> None:
+        """Render at most once per ~16 ms: a slider drag fires far more events than frames are needed."""
+        if self._pending_render is None:
+            self._pending_render = self.root.after(16, self._do_render)
+
+    def _do_render(self) -> None:
+        self._pending_render = None
         self.render()
 
     def reset(self) -> None:
@@ -185,48 +308,59 @@ class LetterApp:
         self.cam_angle.set(0.6)
         self.render()
 
-    def transform_vertices(self) -> List[Vec3]:
+    def _view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rotation (model and camera, without scale) and camera-space offset of the current transform."""
         t = self.transform
-        verts: List[Vec3] = []
-        for v in self.base_verts:
-            vv = scale(v, t.scale)
-            vv = rotate(vv, t.rx, t.ry, t.rz)
-            vv = add(vv, (t.tx * t.scale, t.ty * t.scale, t.tz * t.scale))
-            vv = project(vv, self.cam_angle.get())
-            verts.append(vv)
-        return verts
+        angle = self.cam_angle.get()
+        # the trig and matrix products only depend on the angles; translation and scale drags reuse them
+        key = (t.rx, t.ry, t.rz, angle)
+        if key != self._view_key:
+            self._view_cam = camera_matrix(angle)
+            self._view_rot = self._view_cam @ rotation_matrix(t.rx, t.ry, t.rz)
+            self._view_key = key
+        return self._view_rot, self._view_cam @ (np.array([t.tx, t.ty, t.tz]) * t.scale)
 
     def render(self) -> None:
-        self.canvas.delete("all")
         w = int(self.canvas.winfo_width())
         h = int(self.canvas.winfo_height())
         cx, cy = w / 2, h / 2
 
-        verts = self.transform_vertices()
-
-        # depth sort faces
-        faces_sorted = []
-        for face in self.faces:
-            zs = [verts[idx][2] for idx in face]
-            faces_sorted.append((sum(zs) / len(zs), face))
-        faces_sorted.sort(key=lambda x: x[0], reverse=True)
-
-        base_color = (228, 87, 46)
-        for _, face in faces_sorted:
-            pts2d = []
-            for idx in face:
-                x, y, z = verts[idx]
-                pts2d.append((cx + x, cy - y))
-            # compute shading
-            if len(face) >= 3:
-                n = normal(verts[face[0]], verts[face[1]], verts[face[2]])
-            else:
-                n = (0, 0, 1)
-            fill = shade(base_color, n)
-            coords: List[float] = []
-            for px, py in pts2d:
-                coords.extend([px, py])
-            self.canvas.create_polygon(*coords, fill=fill, outline="#1f2a44", width=1.2)
+        # model -> canvas as one affine map: the camera transform with the y row flipped
+        # (canvas y grows downwards) and the offset moved to the canvas centre
+        rot, offset = self._view()
+        m = rot * self.transform.scale
+        m[1] *= -1
+        offset = offset * (1.0, -1.0, 1.0) + (cx, cy, 0.0)
+        sx, sy, zs = m @ self.base_xyz + offset[:, None]
+
+        # backface culling: the viewer looks along +z, so a face is seen only while its
+        # outward normal points towards -z; the rest are hidden instead of overpainted
+        normals = self.face_model_normals @ rot.T
+        facing = normals[:, 2] * self.face_outward < 0
+        for i in np.flatnonzero(facing == self.face_hidden).tolist():
+            self.face_hidden[i] = not facing[i]
+            self.canvas.itemconfigure(self.face_items[i], state="hidden" if self.face_hidden[i] else "normal")
+
+        # depth sort faces (back to front) by the mean z of their vertices
+        depth = np.add.reduceat(zs[self.face_index], self.face_starts) / self.face_sizes
+        order = np.argsort(-depth, kind="stable")
+        order = order[facing[order]]
+
+        # compute shading
+        fills = shade_batch((228, 87, 46), normals)
+
+        screen = np.empty(2 * len(sx))
+        screen[0::2] = sx
+        screen[1::2] = sy
+        coords = screen[self.face_coord_index].tolist()
+        # raising the faces back to front leaves them stacked in painter's order
+        for i in order.tolist():
+            item = self.face_items[i]
+            self.canvas.coords(item, *coords[self.face_coord_slices[i]])
+            if fills[i] != self.face_fills[i]:
+                self.canvas.itemconfigure(item, fill=fills[i])
+                self.face_fills[i] = fills[i]
+            self.canvas.tag_raise(item)
 
 
 def main() -> None: